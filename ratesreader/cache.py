@@ -0,0 +1,62 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Optional
+
+
+class FileCache:
+    """
+    Simple persistent cache with time to live.
+    Every key is stored as separate JSON file {ts, ttl, payload} in cache directory.
+    """
+
+    def __init__(self,
+                 dir: str = '.cache',
+                 default_ttl: float = 60,
+                 logger: Optional[logging.Logger] = None) -> None:
+        self.dir = dir
+        self.default_ttl = default_ttl
+        self.__logger = logger or logging.getLogger(self.__class__.__module__)
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        :param key: Cache key
+        :return: Cached payload or None if key is missing or expired
+        """
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            self.__logger.warning("Error while reading cache key %s: %r", key, err)
+            return None
+        try:
+            if time.time() - entry['ts'] > entry['ttl']:
+                return None
+            return entry['payload']
+        except (KeyError, TypeError) as err:
+            self.__logger.warning("Invalid cache entry for key %s: %r", key, err)
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        :param key: Cache key
+        :param value: JSON serializable payload
+        :param ttl: Time to live in seconds, default_ttl if None
+        """
+        entry = {'ts': time.time(),
+                 'ttl': self.default_ttl if ttl is None else ttl,
+                 'payload': value}
+        tmp_path = f"{self._path(key)}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError) as err:
+            self.__logger.warning("Error while writing cache key %s: %r", key, err)
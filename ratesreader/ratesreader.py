@@ -1,64 +1,100 @@
 import asyncio
 import datetime
 import decimal
+import hashlib
 import logging
-import random
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from enum import Enum
 from html import unescape
 from itertools import permutations
 from pprint import pprint
-from typing import Dict, Any, Optional, List, Union
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, List, Union, Callable, AsyncIterator, Final
+from urllib.parse import urlencode
 
 import aiohttp
+import orjson
 from aiohttp.typedefs import StrOrURL
-from lxml import html
-
-logging.basicConfig(
-    level=logging.INFO,
-    format=u'%(filename)s:%(lineno)d #%(levelname)-8s [%(asctime)s] - %(name)s - %(message)s',
-)
-# logger = logging.getLogger(__name__)
-
-@dataclass
-class DEFAULTS:
-    """
-    Some default values for following APIs:
-        1. Yahoo Finance (https://finance.yahoo.com/currencies/)
-        2. Moscow Exchange (MOEX) (https://www.moex.com/ru/markets/currency/)
-        3. Garantex Exchange (https://garantex.io)
-        4. Trongrid (https://www.trongrid.io/) (get TRC20 account balance and last 20 transactions)
-        5. Bsccan Binance Smart Chain Explorer (https://bscscan.com/)
-            (get BSC-USD account balance and last 10 transactions)
-        6. Web scrapping currencies rate from https://xe.com
-
-    You must provide own api key for Trongrid and Bsccan
-    """
-    YAHOO_API_URL: str = 'https://query2.finance.yahoo.com/v7/finance/quote'
-    YAHOO_SYMBOLS: str = 'USDRUB=X,CNYRUB=X,USDCNY=X,EURRUB=X,BTC-USD'
-
-    MOEX_API_URL: str = 'https://iss.moex.com/iss/engines/currency/markets/selt/boards/CETS/securities.json'
-    MOEX_SYMBOLS: str = 'USD000UTSTOM,CNYRUB_TOM,EUR_RUB__TOM'
-    MOEX_API_PARAMS = {"iss.meta": "off",
-                       "iss.only": "securities,marketdata",
-                       "securities.columns": "SECID,SHORTNAME,SECNAME",
-                       "marketdata.columns": "WAPRICE,UPDATETIME,SECID,SYSTIME"}
-
-    GARANTEX_API_URL = 'https://garantex.io/api/v2/depth'
-
-    TRON_API_URL: str = 'https://api.trongrid.io/v1/accounts/'
-    TRON_API_KEY: str = 'YOUR TRON API KEY HERE'
-    TRON_USDT_CONTRACT: str = 'TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t'
-
-    BSCSCAN_API_URL: str = 'https://api.bscscan.com/api/'
-    BSCSCAN_API_KEY: str = 'YOUR BSCSCAN API KEY HERE'
-    BSCSCAN_USDT_CONTRACT: str = '0x55d398326f99059ff775485246999027b3197955'
-
-    XE_URL: str = 'https://www.xe.com/currencyconverter/convert/'
-    XE_SYMBOLS: str = 'RUB, USD, CNY, XBT'
-
-    USER_AGENT: str = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) ' \
-                      'Chrome/86.0.4240.198 Safari/537.36 OPR/72.0.3815.465 (Edition Yx GX)'
+from aiohttp_retry import JitterRetry, RetryClient
+from lxml import etree, html
+
+from .cache import FileCache
+
+logger = logging.getLogger(__name__)
+
+# Rates need at most ~8 significant digits, 10 digits context rounds floats from JSON once
+CTX = decimal.Context(prec=10)
+
+_UTC = datetime.timezone.utc
+_fromts = datetime.datetime.fromtimestamp
+
+# XE rate paragraph looks like "1 USD = 91.2345 RUB", split into several text nodes by React
+_XE_XPATH = etree.XPath('//*[@id="__next"]//main/form/div[2]/div[3]/div[1]/div[1]/p[1]//text()')
+_XE_PARSER = html.HTMLParser(remove_blank_text=True, remove_comments=True, remove_pis=True)
+
+
+# Some default values for following APIs:
+#     1. Yahoo Finance (https://finance.yahoo.com/currencies/)
+#     2. Moscow Exchange (MOEX) (https://www.moex.com/ru/markets/currency/)
+#     3. Garantex Exchange (https://garantex.io)
+#     4. Trongrid (https://www.trongrid.io/) (get TRC20 account balance and last 20 transactions)
+#     5. Bsccan Binance Smart Chain Explorer (https://bscscan.com/)
+#         (get BSC-USD account balance and last 10 transactions)
+#     6. Web scrapping currencies rate from https://xe.com
+#
+# You must provide own api key for Trongrid and Bsccan
+YAHOO_API_URL: Final[str] = 'https://query2.finance.yahoo.com/v7/finance/quote'
+YAHOO_SYMBOLS: Final[str] = 'USDRUB=X,CNYRUB=X,USDCNY=X,EURRUB=X,BTC-USD'
+
+MOEX_API_URL: Final[str] = 'https://iss.moex.com/iss/engines/currency/markets/selt/boards/CETS/securities.json'
+MOEX_SYMBOLS: Final[str] = 'USD000UTSTOM,CNYRUB_TOM,EUR_RUB__TOM'
+MOEX_API_PARAMS: Final[Dict[str, str]] = {"iss.meta": "off",
+                                          "iss.only": "securities,marketdata",
+                                          "securities.columns": "SECID,SHORTNAME,SECNAME",
+                                          "marketdata.columns": "WAPRICE,UPDATETIME,SECID,SYSTIME"}
+
+GARANTEX_API_URL: Final[str] = 'https://garantex.io/api/v2/depth'
+
+TRON_API_URL: Final[str] = 'https://api.trongrid.io/v1/accounts/'
+TRON_API_KEY: Final[str] = 'YOUR TRON API KEY HERE'
+TRON_USDT_CONTRACT: Final[str] = 'TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t'
+
+BSCSCAN_API_URL: Final[str] = 'https://api.bscscan.com/api/'
+BSCSCAN_API_KEY: Final[str] = 'YOUR BSCSCAN API KEY HERE'
+BSCSCAN_USDT_CONTRACT: Final[str] = '0x55d398326f99059ff775485246999027b3197955'
+
+XE_URL: Final[str] = 'https://www.xe.com/currencyconverter/convert/'
+XE_SYMBOLS: Final[str] = 'RUB, USD, CNY, XBT'
+
+USER_AGENT: Final[str] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) ' \
+                         'Chrome/86.0.4240.198 Safari/537.36 OPR/72.0.3815.465 (Edition Yx GX)'
+
+# Backward compatible namespace for DEFAULTS.XXX references
+DEFAULTS = SimpleNamespace(YAHOO_API_URL=YAHOO_API_URL,
+                           YAHOO_SYMBOLS=YAHOO_SYMBOLS,
+                           MOEX_API_URL=MOEX_API_URL,
+                           MOEX_SYMBOLS=MOEX_SYMBOLS,
+                           MOEX_API_PARAMS=MOEX_API_PARAMS,
+                           GARANTEX_API_URL=GARANTEX_API_URL,
+                           TRON_API_URL=TRON_API_URL,
+                           TRON_API_KEY=TRON_API_KEY,
+                           TRON_USDT_CONTRACT=TRON_USDT_CONTRACT,
+                           BSCSCAN_API_URL=BSCSCAN_API_URL,
+                           BSCSCAN_API_KEY=BSCSCAN_API_KEY,
+                           BSCSCAN_USDT_CONTRACT=BSCSCAN_USDT_CONTRACT,
+                           XE_URL=XE_URL,
+                           XE_SYMBOLS=XE_SYMBOLS,
+                           USER_AGENT=USER_AGENT)
+
+
+_XE_SYMBOLS = tuple(symbol.strip() for symbol in XE_SYMBOLS.split(','))
+_XE_PAIRS = frozenset(f"{a}/{b}" for a, b in permutations(_XE_SYMBOLS, 2))
+_XE_URL_FOR = {f"{a}/{b}": f"{XE_URL}?Amount=1&From={b}&To={a}" for a, b in permutations(_XE_SYMBOLS, 2)}
+
+# MOEX rows are unpacked by position, so columns order is fixed by requested columns in MOEX_API_PARAMS
+_MOEX_SECURITIES_COLUMNS = MOEX_API_PARAMS['securities.columns'].split(',')
+_MOEX_MARKETDATA_COLUMNS = MOEX_API_PARAMS['marketdata.columns'].split(',')
 
 
 class UrlReaderMode(Enum):
@@ -66,50 +102,108 @@ class UrlReaderMode(Enum):
     JSON = 1
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CurrencyRate:
     symbol: str = ''
     name: str = ''
     rate: decimal.Decimal = decimal.Decimal('0')
-    updated_at: datetime = datetime.datetime.now()
+    updated_at: datetime.datetime = field(default_factory=datetime.datetime.now)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MOEXMetadata:
     shortname: str = ''
     secname: str = ''
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DepthOfMarket:
     market: str
     ask_price: decimal.Decimal
     ask_factor: decimal.Decimal
     bid_price: decimal.Decimal
     bid_factor: decimal.Decimal
-    updated_at: datetime = datetime.datetime.now()
+    updated_at: datetime.datetime = field(default_factory=datetime.datetime.now)
 
 
 class UrlReaderException(BaseException):
     pass
 
 
+class RetryAfterJitterRetry(JitterRetry):
+    """
+    Exponential backoff with jitter which waits for Retry-After seconds (up to MAX_RETRY_AFTER)
+    if server sent them. Retries do not take RateLimiter tokens, so the first retry waits 1-2 seconds
+    and the second 2-3 seconds; one request spends at most 2 * MAX_RETRY_AFTER seconds in retries.
+    """
+    MAX_RETRY_AFTER: float = 10
+
+    def get_timeout(self, attempt: int, response: Optional[aiohttp.ClientResponse] = None) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.MAX_RETRY_AFTER)
+        return super().get_timeout(attempt, response)
+
+
+# aiohttp_retry calls get_timeout starting with attempt=1: 0.5 * 2 ** attempt + U(0, 1) ** 2 seconds
+RETRY_OPTIONS = RetryAfterJitterRetry(attempts=3,
+                                      start_timeout=0.5,
+                                      random_interval_size=1.0,
+                                      statuses={429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """
+    Token bucket limiter for APIs with requests rate limiting.
+    Each request takes one token, tokens are refilled with RATE per second
+    up to MAX_TOKENS. A full bucket allows MAX_TOKENS extra requests on top of RATE
+    in the first second, so keep max_tokens small for strict provider limits.
+    """
+    RATE: float = 10
+    MAX_TOKENS: float = 10
+
+    def __init__(self, rate: Optional[float] = None, max_tokens: Optional[float] = None) -> None:
+        self.rate = rate or self.RATE
+        self.max_tokens = max_tokens or self.MAX_TOKENS
+        self.tokens = self.max_tokens
+        self.updated_at = time.monotonic()
+
+    async def wait_for_token(self) -> None:
+        while True:
+            self.add_new_tokens()
+            if self.tokens >= 1:
+                break
+            await asyncio.sleep(max(0.0, (1 - self.tokens) / self.rate))
+        self.tokens -= 1
+
+    def add_new_tokens(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.tokens + (now - self.updated_at) * self.rate, self.max_tokens)
+        self.updated_at = now
+
+
 class UrlReader:
     """
     This is base class get JSON data or HTML page from various API.
     Fully customizable, may work in asyncio.gather for best performance.
+
+    Reader never creates nor closes the session: one session (see make_session)
+    is created by caller, shared by all readers and closed by caller.
     """
 
     def __init__(self,
-                 session: Optional[aiohttp.ClientSession] = None,
+                 session: aiohttp.ClientSession,
                  url: Optional[StrOrURL] = None,
                  params: Optional[Dict] = None,
                  headers: Optional[Dict] = None,
                  mode: UrlReaderMode = UrlReaderMode.JSON,
                  logger: Optional[logging.Logger] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[FileCache] = None,
                  **kwargs) -> None:
 
-        self.__session = session or aiohttp.ClientSession()
+        self.__session = session
+        self.__retry_client = RetryClient(client_session=session, retry_options=RETRY_OPTIONS)
         self.__url: StrOrURL = url
         self.__params = params or None
         self.__headers = headers or None
@@ -117,7 +211,8 @@ class UrlReader:
         self.__response_status = 0
         self.__response_url: StrOrURL = ''
         self.__logger = logger or logging.getLogger(self.__class__.__module__)
-        self.__result = None
+        self.__rate_limiter = rate_limiter
+        self.__cache = cache
 
     @property
     def session(self):
@@ -126,6 +221,23 @@ class UrlReader:
     @session.setter
     def session(self, session: aiohttp.ClientSession):
         self.__session = session
+        self.__retry_client = RetryClient(client_session=session, retry_options=RETRY_OPTIONS)
+
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        return self.__rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, rate_limiter: Optional[RateLimiter]):
+        self.__rate_limiter = rate_limiter
+
+    @property
+    def cache(self) -> Optional[FileCache]:
+        return self.__cache
+
+    @cache.setter
+    def cache(self, cache: Optional[FileCache]):
+        self.__cache = cache
 
     @property
     def url(self) -> StrOrURL:
@@ -163,21 +275,35 @@ class UrlReader:
     def logger(self):
         return self.__logger
 
+    def _is_cacheable(self, result: Any) -> bool:
+        """
+        :param result: Response received with status 200
+        :return: False if response is API error and must not be cached
+        """
+        return bool(result)
+
+    @staticmethod
+    def _cache_key(url: StrOrURL, params: Optional[Dict] = None) -> str:
+        query = urlencode(sorted(params.items())) if params else ''
+        return hashlib.md5(f"{url}?{query}".encode('utf-8')).hexdigest()
+
     async def _get_raw_data(self, url: StrOrURL = None,
                             params: Dict = None,
                             headers: Dict = None,
-                            delay: float = 0,
                             task_key: str = None,
-                            task_name: str = None
+                            task_name: str = None,
+                            ttl: Optional[float] = None,
+                            parse_fn: Optional[Callable[[Any], Any]] = None
                             ) -> Optional[Dict[str, Any]]:
         """
         :param url: JSON API url
         :param params: params dictionary
         :param headers: headers dictionary
-        :param delay: Delay for adjust API requirements requests rate limiting
         :param task_key: Mixin key in result
         :param task_name: Mixin key value in result
-        :return: JSON response
+        :param ttl: Cache response for ttl seconds if cache is attached, no caching if None
+        :param parse_fn: Parser applied to response as soon as it is received
+        :return: JSON response or parse_fn result
         """
         url = url or self.__url
         if not url and not self.__url:
@@ -185,104 +311,168 @@ class UrlReader:
             raise ValueError("Url can not be None.")
         params = params or self.params
         headers = headers or self.headers
-        self.__result = None
-        try:
-            await asyncio.sleep(delay)
-            async with self.session.get(url, params=params, headers=headers) as response:
-                self.__response_url = response.url
-                self.__response_status = response.status
-                self.__result = await response.json(encoding='utf-8') \
-                    if self.__mode == UrlReaderMode.JSON else await response.text()
-                if self.__result and task_key and task_key in self.__result and self.__mode == UrlReaderMode.JSON:
-                    raise KeyError(f"Task key {task_key} already exist in JSON data.")
-                if task_key and not task_name:
-                    self.__logger.warning("Task name is None for task key %s.", task_key)
-                if task_key and self.__mode == UrlReaderMode.JSON:
-                    self.__result[task_key] = task_name
-        except aiohttp.ClientError as err:
-            self.__logger.error("Error while fetching url: %r,\nresponse is %s.", err, unescape(await response.text()))
-        except Exception as err:
-            self.__logger.error("Error while fetching url: %r,\nresponse is %s.", err, unescape(await response.text()))
-        finally:
-            return self.__result
-
-
-class YahooReader(UrlReader):
+        cache_key = self._cache_key(url, params) if self.__cache and ttl else None
+        result = self.__cache.get(cache_key) if cache_key else None
+        if result is None:
+            try:
+                if self.__rate_limiter:
+                    await self.__rate_limiter.wait_for_token()
+                async with self.__retry_client.get(url, params=params, headers=headers) as response:
+                    self.__response_url = response.url
+                    self.__response_status = response.status
+                    if response.status != 200:
+                        text = await response.text()
+                        self.__logger.error("Error while fetching url %s: status %s,\nresponse is %s.",
+                                            response.url, response.status, unescape(text))
+                        return None
+                    if self.__mode == UrlReaderMode.JSON:
+                        if 'json' not in response.content_type:
+                            self.__logger.error("Error while fetching url %s: unexpected content type %s.",
+                                                response.url, response.content_type)
+                            return None
+                        result = orjson.loads(await response.read())
+                    else:
+                        result = await response.text()
+            except asyncio.CancelledError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as err:
+                self.__logger.error("Error while fetching url %s: %r.", url, err)
+                return None
+            if cache_key and self._is_cacheable(result):
+                self.__cache.set(cache_key, result, ttl)
+        if result and task_key and task_key in result and self.__mode == UrlReaderMode.JSON:
+            raise KeyError(f"Task key {task_key} already exist in JSON data.")
+        if task_key and not task_name:
+            self.__logger.warning("Task name is None for task key %s.", task_key)
+        if task_key and self.__mode == UrlReaderMode.JSON:
+            result[task_key] = task_name
+        return parse_fn(result) if parse_fn else result
+
+
+class SymbolsBatchMixin:
+    """
+    Fetch rates for several symbols lists with one request of reader which accepts comma separated symbols.
+    """
+
+    @classmethod
+    async def fetch_many(cls,
+                         session: aiohttp.ClientSession,
+                         batches: List[List[str]],
+                         ttl: Optional[float] = 60,
+                         cache: Optional[FileCache] = None,
+                         logger: Optional[logging.Logger] = None) -> Optional[Dict[str, CurrencyRate]]:
+        """
+        :param session: Shared client session
+        :param batches: Symbols lists, merged and de-duplicated into one request
+        :param ttl: Cache time to live in seconds
+        :param cache: Response cache
+        :param logger: Reader logger
+        :return: Currencies rates for all symbols
+        """
+        all_symbols = sorted({symbol.strip() for batch in batches for symbol in batch if symbol.strip()})
+        if not all_symbols:
+            return {}
+        return await cls(session, symbols=all_symbols, logger=logger, cache=cache).get_rates(ttl=ttl)
+
+
+class YahooReader(SymbolsBatchMixin, UrlReader):
     def __init__(self,
-                 session: Optional[aiohttp.ClientSession] = None,
+                 session: aiohttp.ClientSession,
                  symbols: Union[str, List[str]] = 'RUB=X',
-                 logger: Optional[logging.Logger] = None) -> None:
-        super().__init__(session, DEFAULTS.YAHOO_API_URL, logger)
+                 logger: Optional[logging.Logger] = None,
+                 cache: Optional[FileCache] = None) -> None:
+        super().__init__(session, YAHOO_API_URL, logger=logger, cache=cache)
         if isinstance(symbols, str):
             symbols = [symbols]
         if not isinstance(symbols, list):
             raise ValueError("Symbols must be string or list of strings.")
         self.params: dict = {"symbols": ",".join(symbols)}
-        self.headers: dict = {"User-Agent": DEFAULTS.USER_AGENT,
+        self.headers: dict = {"User-Agent": USER_AGENT,
                               'Content-Type': "application/json"}
         self.source_name: str = "YAHOO"
         self.source_url: StrOrURL = "https://finance.yahoo.com/currencies/"
 
-    async def get_rates(self) -> dict:
+    def _is_cacheable(self, result: Any) -> bool:
+        return bool(result) and not result.get('quoteResponse', {}).get('error')
+
+    async def get_rates(self, ttl: Optional[float] = 60) -> dict:
         """
+        :param ttl: Cache time to live in seconds
         :return: Currencies rates
         """
         json_data = await self._get_raw_data(url=self.url,
                                              params=self.params,
-                                             headers=self.headers)
+                                             headers=self.headers,
+                                             ttl=ttl)
+        if not json_data:
+            return None
         return {data['symbol']: CurrencyRate(data['symbol'],
                                              data['shortName'],
-                                             decimal.Decimal(str(data['regularMarketPrice'])),
+                                             CTX.create_decimal_from_float(data['regularMarketPrice']),
                                              datetime.datetime.now()
-                                             ) for data in json_data['quoteResponse']['result'] if json_data}
+                                             ) for data in json_data['quoteResponse']['result']}
 
 
-class MOEXReader(UrlReader):
+class MOEXReader(SymbolsBatchMixin, UrlReader):
     def __init__(self,
-                 session: Optional[aiohttp.ClientSession] = None,
+                 session: aiohttp.ClientSession,
                  symbols: Union[str, List[str]] = 'USD000UTSTOM',
-                 logger: Optional[logging.Logger] = None) -> None:
+                 logger: Optional[logging.Logger] = None,
+                 cache: Optional[FileCache] = None) -> None:
 
-        super().__init__(session, DEFAULTS.MOEX_API_URL, logger)
+        super().__init__(session, MOEX_API_URL, logger=logger, cache=cache)
         if isinstance(symbols, list):
             symbols = ", ".join(symbols)
         if not isinstance(symbols, str):
             raise ValueError("Symbols must be string or list of strings.")
         self.symbols: str = symbols
-        self.params: dict = DEFAULTS.MOEX_API_PARAMS
-        self.headers: dict = {"User-Agent": DEFAULTS.USER_AGENT,
+        self._symbol_set = frozenset(symbol.strip() for symbol in symbols.split(','))
+        self.params: dict = MOEX_API_PARAMS
+        self.headers: dict = {"User-Agent": USER_AGENT,
                               'Content-Type': "application/json"}
         self.source_name: str = "MOEX"
         self.source_url: StrOrURL = "https://www.moex.com/ru/markets/currency/"
 
         self.__moex_metadata: dict = {}
 
-    async def get_rates(self) -> Optional[Dict[str, Any]]:
+    async def get_rates(self, ttl: Optional[float] = 60) -> Optional[Dict[str, Any]]:
         """
+        :param ttl: Cache time to live in seconds
         :return: Currencies rates
         """
         json_data = await self._get_raw_data(url=self.url,
                                              params=self.params,
-                                             headers=self.headers)
-        self.__moex_metadata = {data[0]: MOEXMetadata(data[1], data[2]) for data in json_data['securities']['data']
-                                if json_data}
-        return {data[2]: CurrencyRate(self.__moex_metadata[data[2]].shortname,
-                                      self.__moex_metadata[data[2]].secname,
-                                      decimal.Decimal(str(data[0]) or '0'),
-                                      datetime.datetime.fromisoformat(data[3]))
-                for data in json_data['marketdata']['data'] if json_data and (data[0] and data[2] in self.symbols)}
+                                             headers=self.headers,
+                                             ttl=ttl)
+        if not json_data:
+            return None
+        if json_data['securities']['columns'] != _MOEX_SECURITIES_COLUMNS or \
+                json_data['marketdata']['columns'] != _MOEX_MARKETDATA_COLUMNS:
+            self.logger.error("Unexpected MOEX columns: %s, %s",
+                              json_data['securities']['columns'], json_data['marketdata']['columns'])
+            return None
+        self.__moex_metadata = {secid: MOEXMetadata(shortname, secname)
+                                for secid, shortname, secname in json_data['securities']['data']}
+        meta = self.__moex_metadata
+        return {secid: CurrencyRate(meta[secid].shortname,
+                                    meta[secid].secname,
+                                    CTX.create_decimal_from_float(waprice),
+                                    datetime.datetime.fromisoformat(systime))
+                for waprice, _updatetime, secid, systime in json_data['marketdata']['data']
+                if waprice and secid in self._symbol_set}
 
 
 class GarantexReader(UrlReader):
     def __init__(self,
-                 session: Optional[aiohttp.ClientSession] = None,
+                 session: aiohttp.ClientSession,
                  market: str = 'usdtrub',
-                 logger: Optional[logging.Logger] = None) -> None:
-        super().__init__(session, DEFAULTS.GARANTEX_API_URL, logger)
+                 logger: Optional[logging.Logger] = None,
+                 cache: Optional[FileCache] = None) -> None:
+        super().__init__(session, GARANTEX_API_URL, logger=logger, cache=cache)
         if not isinstance(market, str):
             raise ValueError("Market must be string.")
         self.params: dict = {"market": market}
-        self.headers: dict = {"User-Agent": DEFAULTS.USER_AGENT,
+        self.headers: dict = {"User-Agent": USER_AGENT,
                               'Content-Type': "application/json"}
         self.source_name: str = "GARANTEX"
         self.source_url: StrOrURL = "https://garantex.io/"
@@ -303,205 +493,260 @@ class GarantexReader(UrlReader):
 
 class TronWalletReader(UrlReader):
     def __init__(self,
+                 session: aiohttp.ClientSession,
                  wallets: Union[str, List[str]],
-                 usdt_contract: str = DEFAULTS.TRON_USDT_CONTRACT,
-                 api_key: Optional[str] = DEFAULTS.TRON_API_KEY,
-                 session: Optional[aiohttp.ClientSession] = None,
-                 logger: Optional[logging.Logger] = None) -> None:
-        super().__init__(session, DEFAULTS.TRON_API_URL, logger)
-        self.headers = {'User-Agent': DEFAULTS.USER_AGENT,
+                 usdt_contract: str = TRON_USDT_CONTRACT,
+                 api_key: Optional[str] = TRON_API_KEY,
+                 logger: Optional[logging.Logger] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[FileCache] = None) -> None:
+        super().__init__(session, TRON_API_URL, logger=logger, cache=cache)
+        self.rate_limiter = rate_limiter or RateLimiter(rate=15, max_tokens=1)
+        self.headers = {'User-Agent': USER_AGENT,
                         'Content-Type': "application/json",
                         'Accept': "application/json"}
         if api_key:
             self.headers['TRON-PRO-API-KEY'] = api_key
         self.scale = 10 ** 6
         self.usdt_contract: str = usdt_contract
-        self.__wallets: list = []
-        self.urls: dict = {}
-        self.trnx_urls: dict = {}
+        self.__wallets: tuple = ()
         self.wallets = wallets
 
     @property
-    def wallets(self) -> list:
+    def wallets(self) -> tuple:
         return self.__wallets
 
     @wallets.setter
     def wallets(self, value: Union[str, List[str]]):
         if isinstance(value, str):
-            self.__wallets = ''.join(value.split()).split(',')
-        elif isinstance(value, list):
-            self.__wallets = value
+            self.__wallets = tuple(''.join(value.split()).split(','))
+        elif isinstance(value, (list, tuple)):
+            self.__wallets = tuple(value)
         else:
             raise ValueError("Wallets must be string or list of strings.")
-        self.urls = {wallet: f"{self.url}{wallet}" for wallet in self.__wallets}
-        self.trnx_urls = {wallet: f"{self.url}{wallet}/transactions/trc20" for wallet in self.__wallets}
 
-    async def __fetch_urls(self, urls) -> Optional[tuple]:
+    def _is_cacheable(self, result: Any) -> bool:
+        return bool(result) and result.get('success', False)
+
+    def _mk_balance_url(self, wallet: str) -> str:
+        return f"{self.url}{wallet}"
+
+    def _mk_trnx_url(self, wallet: str) -> str:
+        return f"{self.url}{wallet}/transactions/trc20"
+
+    async def __fetch_urls(self, mk_url: Callable[[str], str], ttl: Optional[float] = None,
+                           parse_fn: Optional[Callable[[Any], Any]] = None) -> Optional[tuple]:
         """
-        :return: Raw JSON response
+        :param mk_url: Request url builder for wallet
+        :param ttl: Cache time to live in seconds
+        :param parse_fn: Parser applied to each response as soon as it is received
+        :return: Raw JSON response or parse_fn results
         """
-        delay = random.uniform(0.07, 0.09)
-        tasks = [asyncio.create_task(self._get_raw_data(url=url,
+        tasks = [asyncio.create_task(self._get_raw_data(url=mk_url(wallet),
                                                         params=self.params,
                                                         headers=self.headers,
-                                                        delay=delay * i,
                                                         task_key='wallet_address',
-                                                        task_name=address))
-                 for i, (address, url) in enumerate(urls.items(), start=1)]
+                                                        task_name=wallet,
+                                                        ttl=ttl,
+                                                        parse_fn=parse_fn))
+                 for wallet in self.__wallets]
         responses = await asyncio.gather(*tasks, return_exceptions=True)
         return responses
 
-    async def get_balances(self) -> Optional[dict]:
+    async def get_balances(self, ttl: Optional[float] = 30) -> Optional[dict]:
         """
+        :param ttl: Cache time to live in seconds
         :return: Wallets balances
         """
         wallets = {address: 0 for address in self.__wallets}
-        raw_data = await self.__fetch_urls(self.urls)
-        for balance in raw_data:
-            if not balance['success']:
-                wallets[balance['wallet_address']] = -1
-                self.logger.info("Error: %s, wallet: %s", balance['error'], balance['wallet_address'])
+        raw_data = await self.__fetch_urls(self._mk_balance_url, ttl=ttl)
+        for address, balance in zip(self.__wallets, raw_data):
+            if not isinstance(balance, dict) or not balance.get('success', False):
+                wallets[address] = -1
+                self.logger.info("Error: %s, wallet: %s",
+                                 balance.get('error', 'Unknown error') if isinstance(balance, dict) else balance,
+                                 address)
                 continue
             trc20 = next((item for item in balance['data'] if item["trc20"]), None)
-            wallets[balance['wallet_address']] = int(next((item.get(self.usdt_contract, 0) for item in trc20["trc20"]
-                                                           if item.get(self.usdt_contract, None)), 0)) if trc20 else 0
+            wallets[address] = int(next((item.get(self.usdt_contract, 0) for item in trc20["trc20"]
+                                         if item.get(self.usdt_contract, None)), 0)) if trc20 else 0
         return wallets
 
-    async def get_transactions(self) -> Optional[dict]:
+    async def get_transactions(self, ttl: Optional[float] = 60) -> Optional[dict]:
         """
+        :param ttl: Cache time to live in seconds
         :return: Last wallet transactions
         """
         wallets = {address: [] for address in self.__wallets}
-        raw_data = await self.__fetch_urls(self.trnx_urls)
-        for transactions in raw_data:
-            if not transactions.get('success', False):
-                self.logger.info("Error: %s, wallet: %s", transactions.get('error', 'Unknown error'),
-                                 transactions['wallet_address'])
-                continue
-            for trn in transactions['data']:
-                if trn['token_info']['address'] != DEFAULTS.TRON_USDT_CONTRACT or \
-                        trn['token_info']['symbol'].upper() != 'USDT':
-                    continue
-                value = int(trn['value'])
-                trn_from = trn['from']
-                if trn_from == transactions['wallet_address']:
-                    trn_from = trn['to']
-                    value *= -1
-
-                wallets[transactions['wallet_address']].append({'wallet': trn_from,
-                                                                'timestamp': datetime.datetime.fromtimestamp(
-                                                                    trn['block_timestamp'] / 1000.0,
-                                                                    datetime.timezone.utc),
-                                                                'value': value})
+        raw_data = await self.__fetch_urls(self._mk_trnx_url, ttl=ttl, parse_fn=self._parse_trn)
+        for address, transactions in zip(self.__wallets, raw_data):
+            if isinstance(transactions, tuple):
+                wallets[address] = transactions[1]
+            else:
+                self.logger.info("Error: %s, wallet: %s", transactions, address)
         return wallets
 
+    def _parse_trn(self, transactions: Optional[dict]) -> Optional[tuple]:
+        """
+        :param transactions: Raw JSON response for one wallet
+        :return: Wallet address and its USDT transactions
+        """
+        if not transactions:
+            return None
+        address = transactions['wallet_address']
+        if not transactions.get('success', False):
+            self.logger.info("Error: %s, wallet: %s", transactions.get('error', 'Unknown error'), address)
+            return address, []
+        result = []
+        for trn in transactions['data']:
+            if trn['token_info']['address'] != self.usdt_contract or \
+                    trn['token_info']['symbol'].upper() != 'USDT':
+                continue
+            value = int(trn['value'])
+            trn_from = trn['from']
+            if trn_from == address:
+                trn_from = trn['to']
+                value *= -1
+
+            result.append({'wallet': trn_from,
+                           'timestamp': _fromts(trn['block_timestamp'] / 1000.0, _UTC),
+                           'value': value})
+        return address, result
+
 
 class BscScanWalletReader(UrlReader):
     def __init__(self,
+                 session: aiohttp.ClientSession,
                  wallets: Union[str, List[str]],
-                 usdt_contract: str = DEFAULTS.BSCSCAN_USDT_CONTRACT,
-                 api_key: Optional[str] = DEFAULTS.BSCSCAN_API_KEY,
-                 session: Optional[aiohttp.ClientSession] = None,
-                 logger: Optional[logging.Logger] = None) -> None:
-        super().__init__(session, DEFAULTS.BSCSCAN_API_URL, logger)
-        self.headers = {'User-Agent': DEFAULTS.USER_AGENT,
+                 usdt_contract: str = BSCSCAN_USDT_CONTRACT,
+                 api_key: Optional[str] = BSCSCAN_API_KEY,
+                 logger: Optional[logging.Logger] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[FileCache] = None) -> None:
+        super().__init__(session, BSCSCAN_API_URL, logger=logger, cache=cache)
+        self.rate_limiter = rate_limiter or RateLimiter(rate=5, max_tokens=1)
+        self.headers = {'User-Agent': USER_AGENT,
                         'Content-Type': "application/json",
                         'Accept': "application/json"}
         self.scale = 10 ** 12
         self.usdt_contract: str = usdt_contract
         self.api_key: str = api_key
-        self.__wallets: list = []
-        self.balance_params_list: list = []
-        self.trnx_params_list: list = []
+        self.__wallets: tuple = ()
         self.wallets = wallets
-        self.url: StrOrURL = DEFAULTS.BSCSCAN_API_URL
+        self.url: StrOrURL = BSCSCAN_API_URL
 
     @property
-    def wallets(self):
+    def wallets(self) -> tuple:
         return self.__wallets
 
     @wallets.setter
     def wallets(self, value: Union[str, List[str]]):
         if isinstance(value, str):
-            self.__wallets = ''.join(value.split()).split(',')
-        elif isinstance(value, list):
-            self.__wallets = value
+            self.__wallets = tuple(''.join(value.split()).split(','))
+        elif isinstance(value, (list, tuple)):
+            self.__wallets = tuple(value)
         else:
             raise ValueError("Wallets must be string or list of strings.")
-        self.balance_params_list = [{'module': 'account',
-                                     'action': 'tokenbalance',
-                                     'contractaddress': self.usdt_contract,
-                                     'address': wallet,
-                                     'tag': 'latest',
-                                     'apikey': self.api_key} for wallet in self.wallets]
-        self.trnx_params_list = [{'module': 'account',
-                                  'action': 'tokentx',
-                                  'contractaddress': DEFAULTS.BSCSCAN_USDT_CONTRACT,
-                                  'address': wallet,
-                                  'page': '1',
-                                  'offset': '10',
-                                  'startblock': '0',
-                                  'endblock': '999999999',
-                                  'sort': 'desc',
-                                  'apikey': self.api_key} for wallet in self.wallets]
-
-    async def __fetch_urls(self, params: list) -> Optional[tuple]:
-        """
-        :return: Raw JSON response
-        """
-        delay = random.uniform(0.01, 0.03)
+
+    def _mk_balance_params(self, wallet: str) -> dict:
+        return {'module': 'account',
+                'action': 'tokenbalance',
+                'contractaddress': self.usdt_contract,
+                'address': wallet,
+                'tag': 'latest',
+                'apikey': self.api_key}
+
+    def _mk_trnx_params(self, wallet: str) -> dict:
+        return {'module': 'account',
+                'action': 'tokentx',
+                'contractaddress': self.usdt_contract,
+                'address': wallet,
+                'page': '1',
+                'offset': '10',
+                'startblock': '0',
+                'endblock': '999999999',
+                'sort': 'desc',
+                'apikey': self.api_key}
+
+    def _is_cacheable(self, result: Any) -> bool:
+        return bool(result) and result.get('message', '').upper() == 'OK'
+
+    async def __fetch_urls(self, mk_params: Callable[[str], dict], ttl: Optional[float] = None,
+                           parse_fn: Optional[Callable[[Any], Any]] = None) -> Optional[tuple]:
+        """
+        :param mk_params: Request params builder for wallet
+        :param ttl: Cache time to live in seconds
+        :param parse_fn: Parser applied to each response as soon as it is received
+        :return: Raw JSON response or parse_fn results
+        """
         tasks = [asyncio.create_task(self._get_raw_data(self.url,
-                                                        params=wallet_params,
+                                                        params=mk_params(wallet),
                                                         headers=self.headers,
-                                                        delay=delay * i,
                                                         task_key='wallet_address',
-                                                        task_name=wallet_params['address']))
-                 for i, wallet_params in enumerate(params, start=1)]
+                                                        task_name=wallet,
+                                                        ttl=ttl,
+                                                        parse_fn=parse_fn))
+                 for wallet in self.__wallets]
         responses = await asyncio.gather(*tasks, return_exceptions=True)
         return responses
 
-    async def get_balances(self) -> Optional[dict]:
+    async def get_balances(self, ttl: Optional[float] = 30) -> Optional[dict]:
         """
+        :param ttl: Cache time to live in seconds
         :return: Wallets balances
         """
         wallets = {address: 0 for address in self.__wallets}
-        raw_data = await self.__fetch_urls(self.balance_params_list)
-        for balance in raw_data:
-            if balance['message'].upper() == 'OK':
-                wallets[balance['wallet_address']] = int(balance['result'])
+        raw_data = await self.__fetch_urls(self._mk_balance_params, ttl=ttl)
+        for address, balance in zip(self.__wallets, raw_data):
+            if isinstance(balance, dict) and balance.get('message', '').upper() == 'OK':
+                wallets[address] = int(balance['result'])
             else:
-                self.logger.info("Error: %s, wallet: %s", balance.get('message', 'Unknown error'),
-                                 balance['wallet_address'])
-                wallets[balance['wallet_address']] = -1
+                self.logger.info("Error: %s, wallet: %s",
+                                 balance.get('message', 'Unknown error') if isinstance(balance, dict) else balance,
+                                 address)
+                wallets[address] = -1
         return wallets
 
-    async def get_transactions(self) -> Optional[dict]:
+    async def get_transactions(self, ttl: Optional[float] = 60) -> Optional[dict]:
         """
+        :param ttl: Cache time to live in seconds
         :return: Last 10 wallet transactions
         """
         wallets = {address: [] for address in self.__wallets}
-        raw_data = await self.__fetch_urls(self.trnx_params_list)
-        for transactions in raw_data:
-            if not transactions or transactions['message'].upper() != 'OK':
-                self.logger.info("Error: %s, wallet: %s", transactions.get('message', 'Unknown error'),
-                                 transactions['wallet_address'])
-                continue
-            for trn in transactions['result']:
-                if trn['tokenSymbol'] != 'BSC-USD':
-                    continue
-                value = int(trn['value'])
-                trn_from = trn['from']
-                if trn_from.upper() == transactions['wallet_address'].upper():
-                    trn_from = trn['to']
-                    value *= -1
-
-                wallets[transactions['wallet_address']].append({'wallet': trn_from,
-                                                                'timestamp': datetime.datetime.fromtimestamp(
-                                                                    int(trn['timeStamp']),
-                                                                    datetime.timezone.utc),
-                                                                'value': value})
+        raw_data = await self.__fetch_urls(self._mk_trnx_params, ttl=ttl, parse_fn=self._parse_trn)
+        for address, transactions in zip(self.__wallets, raw_data):
+            if isinstance(transactions, tuple):
+                wallets[address] = transactions[1]
+            else:
+                self.logger.info("Error: %s, wallet: %s", transactions, address)
         return wallets
 
+    def _parse_trn(self, transactions: Optional[dict]) -> Optional[tuple]:
+        """
+        :param transactions: Raw JSON response for one wallet
+        :return: Wallet address and its BSC-USD transactions
+        """
+        if not transactions:
+            return None
+        address = transactions['wallet_address']
+        if transactions.get('message', '').upper() != 'OK':
+            self.logger.info("Error: %s, wallet: %s", transactions.get('message', 'Unknown error'), address)
+            return address, []
+        result = []
+        for trn in transactions['result']:
+            if trn['tokenSymbol'] != 'BSC-USD':
+                continue
+            value = int(trn['value'])
+            trn_from = trn['from']
+            if trn_from.upper() == address.upper():
+                trn_from = trn['to']
+                value *= -1
+
+            result.append({'wallet': trn_from,
+                           'timestamp': _fromts(int(trn['timeStamp']), _UTC),
+                           'value': value})
+        return address, result
+
 
 class HTMLReader(UrlReader):
     """
@@ -510,20 +755,24 @@ class HTMLReader(UrlReader):
     """
 
     def __init__(self,
+                 session: aiohttp.ClientSession,
                  urls: Union[str, List[str]] = None,
-                 session: Optional[aiohttp.ClientSession] = None,
                  params: Optional[Dict] = None,
                  headers: Optional[Dict] = None,
                  logger: Optional[logging.Logger] = None,
+                 concurrency: int = 16,
+                 cache: Optional[FileCache] = None,
                  **kwargs) -> None:
-        super().__init__(session=session, params=params, headers=headers, mode=UrlReaderMode.HTML, logger=logger)
+        super().__init__(session=session, params=params, headers=headers, mode=UrlReaderMode.HTML, logger=logger,
+                         cache=cache)
+        self._sem = asyncio.Semaphore(concurrency)
         if isinstance(urls, str):
             self.__urls = ''.join(urls.split()).split(',')
         elif isinstance(urls, list):
             self.__urls = urls
         else:
             raise ValueError("Urls must be string or list of strings.")
-        self.headers = {"User-Agent": DEFAULTS.USER_AGENT}
+        self.headers = {"User-Agent": USER_AGENT}
 
     @property
     def urls(self):
@@ -536,16 +785,35 @@ class HTMLReader(UrlReader):
         elif isinstance(value, list):
             self.__urls = value
 
-    async def get_pages(self) -> Optional[tuple]:
+    async def _bounded(self, url: StrOrURL, ttl: Optional[float] = None) -> Optional[str]:
+        async with self._sem:
+            return await self._get_raw_data(url=url,
+                                            params=self.params,
+                                            headers=self.headers,
+                                            ttl=ttl)
+
+    async def get_pages(self, ttl: Optional[float] = None) -> Optional[tuple]:
         """
-        :return: Raw HTML responses
+        :param ttl: Cache time to live in seconds
+        :return: Raw HTML responses in urls order
         """
-        tasks = [asyncio.create_task(self._get_raw_data(url=url,
-                                                        params=self.params,
-                                                        headers=self.headers)) for url in self.__urls]
+        tasks = [asyncio.create_task(self._bounded(url, ttl=ttl)) for url in self.__urls]
         responses = await asyncio.gather(*tasks, return_exceptions=True)
         return responses
 
+    async def iter_pages(self, ttl: Optional[float] = None) -> AsyncIterator[Union[str, None, Exception]]:
+        """
+        :param ttl: Cache time to live in seconds
+        :return: Raw HTML responses in order of completion, failed request result is its exception
+        """
+        for page in asyncio.as_completed([self._bounded(url, ttl=ttl) for url in self.__urls]):
+            try:
+                yield await page
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                yield err
+
 
 class XeReader(HTMLReader):
     """
@@ -554,112 +822,136 @@ class XeReader(HTMLReader):
     """
 
     def __init__(self,
-                 session: Optional[aiohttp.ClientSession] = None,
+                 session: aiohttp.ClientSession,
                  symbols: Union[str, List[str]] = 'USD/RUB',
-                 logger: Optional[logging.Logger] = None) -> None:
-        super().__init__(session=session, urls=[], mode=UrlReaderMode.HTML, logger=logger)
-        self.__symbols = ''.join(DEFAULTS.XE_SYMBOLS.split()).split(',')
-        self.__pairs = [f"{pair[0]}/{pair[1]}" for pair in permutations(self.__symbols, 2)]
+                 logger: Optional[logging.Logger] = None,
+                 cache: Optional[FileCache] = None) -> None:
+        super().__init__(session=session, urls=[], mode=UrlReaderMode.HTML, logger=logger, cache=cache)
         if isinstance(symbols, str):
             symbols = ''.join(symbols.split()).split(',')
         if not isinstance(symbols, list):
             raise ValueError("Symbols must be string or list of strings.")
-        if not set(symbols).issubset(self.__pairs):
+        if not _XE_PAIRS.issuperset(symbols):
             raise ValueError(f"Following currency pairs not supported: "
-                             f"{', '.join(set(symbols).difference(set(self.__pairs)))}")
-        self.headers: dict = {"User-Agent": DEFAULTS.USER_AGENT}
-        self.urls = [f"{DEFAULTS.XE_URL}?Amount=1&From={pair[4:]}&To={pair[:3]}" for pair in symbols]
+                             f"{', '.join(set(symbols).difference(_XE_PAIRS))}")
+        self.headers: dict = {"User-Agent": USER_AGENT}
+        self.urls = [_XE_URL_FOR[pair] for pair in symbols]
 
-    async def get_rates(self) -> Optional[Dict[str, Any]]:
-        pages = await self.get_pages()
+    async def get_rates(self, ttl: Optional[float] = 300) -> Optional[Dict[str, Any]]:
+        """
+        :param ttl: Cache time to live in seconds
+        :return: Currencies rates
+        """
         rates = {}
-        for page in pages:
-            tree = html.fromstring(page)
-            rate = tree.xpath('//*[@id="__next"]/div[2]/div[2]/section/'
-                              'div[2]/div/main/form/div[2]/div[3]/div[1]/div[1]/p[1]//text()')
-            meta_rate = rate[0].split()
-            if not len(meta_rate):
+        async for page in self.iter_pages(ttl=ttl):
+            if not isinstance(page, str) or not page.strip():
+                continue
+            try:
+                tree = html.fromstring(page, parser=_XE_PARSER)
+            except etree.ParserError as err:
+                self.logger.error("Can not parse XE page: %r.", err)
+                continue
+            # Digits of the rate may be split between several text nodes
+            meta_rate = ''.join(_XE_XPATH(tree)).split()
+            if len(meta_rate) < 4:
                 continue
             symbol = f"{meta_rate[1]}/{meta_rate[-1]}"
+            try:
+                rate = decimal.Decimal(meta_rate[-2].replace(',', ''))
+            except decimal.InvalidOperation:
+                self.logger.error("Can not parse XE rate %r for %s.", meta_rate[-2], symbol)
+                continue
             rates[symbol] = CurrencyRate(symbol,
                                          symbol,
-                                         decimal.Decimal(meta_rate[-2].replace(',', '')),
+                                         rate,
                                          datetime.datetime.now()
                                          )
         return rates
 
 
+def make_session(**kwargs) -> aiohttp.ClientSession:
+    """
+    Create client session to share between readers, must be called from running event loop.
+    Connection pool and DNS cache are reused by all readers, caller must close the session.
+    :param kwargs: Extra aiohttp.ClientSession arguments
+    :return: Client session
+    """
+    connector = aiohttp.TCPConnector(limit=100,
+                                     limit_per_host=10,
+                                     ttl_dns_cache=300,
+                                     enable_cleanup_closed=True)
+    return aiohttp.ClientSession(connector=connector, **kwargs)
+
+
+async def fetch_all(session: aiohttp.ClientSession, *readers: UrlReader) -> list:
+    """
+    Run readers concurrently over one shared session.
+    :param session: Shared client session
+    :param readers: Readers with get_rates or get_dom coroutine
+    :return: Results in readers order, failed reader result is its exception
+    """
+    fetches = []
+    for reader in readers:
+        if reader.session is not session:
+            raise ValueError(f"{reader.__class__.__name__} is not bound to the shared session.")
+        fetch = getattr(reader, 'get_rates', None) or getattr(reader, 'get_dom', None)
+        if fetch is None:
+            raise ValueError(f"{reader.__class__.__name__} has no get_rates or get_dom method.")
+        fetches.append(fetch)
+    tasks = [asyncio.create_task(fetch()) for fetch in fetches]
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
 async def test():
-    # yahoo_reader = YahooReader(symbols=DEFAULTS.YAHOO_SYMBOLS)
-    # rates = await yahoo_reader.get_rates()
-    # pprint(rates)
-    # await yahoo_reader.session.close()
-    # #
-    # moex_reader = MOEXReader(symbols=['USD000UTSTOM', 'CNYRUB_TOM'])
-    # rates = await moex_reader.get_rates()
-    # pprint(rates)
-    # await moex_reader.session.close()
-    # #
-    # garantex_reader = GarantexReader()
-    # dom = await garantex_reader.get_dom()
-    # pprint(dom)
-    # await garantex_reader.session.close()
-    # # 'TEnGt4WMjmVDmfDm9EC6xQXPWtMpuetobC'
-    # # 'TZGRrMPEQMXyZndV1BaRy4SuCd3aTuKGBi'
-    # # 'TYmxU6gD48Hf82cpBBHTHNJkhn1W6MrfML'
-    # # 'TC1NPeCNwCb4bazcpHig2q3s3bFQBHUt2D'
-    #
-    # # tron_reader = TronWalletReader(
-    # #     'TZGRrMPEQMXyZndV1BaRy4SuCd3aTuKGBi')
-    #
-    # pprint(balances)
-    # tron_reader = TronWalletReader(['TZGRrMPEQMXyZndV1BaRy4SuCd3aTuKGBi',
-    #                                 'TEnGt4WMjmVDmfDm9EC6xQXPWtMpuetobC',
-    #                                 'TYmxU6gD48Hf82cpBBHTHNJkhn1W6MrfML',
-    #                                 'TC1NPeCNwCb4bazcpHig2q3s3bFQBHUt2D'])
-    # raw_data = await tron_reader.get_raw_data()
-    # pprint(raw_data)
-    #
-    # balances = await tron_reader.get_balances()
-    # pprint(balances)
-    #
-    # trnx = await tron_reader.get_transactions()
-    # pprint(trnx)
-    # await tron_reader.session.close()
-    # bscscan_reader = BscScanWalletReader(
-    #     '0xE5855278Ecf07e423BAecE3168fAD755B117E261')
-    # balances = await bscscan_reader.get_balances()
-    # pprint(balances)
-    # trnx = await bscscan_reader.get_transactions()
-    # pprint(trnx)
-    # await bscscan_reader.session.close()
-    # https://www.xe.com/currencyconverter/convert/?Amount=25&From=USD&To=RUB
-    # ['https://czcb.com.cn/','https://www.vl.ru/dengi/']
-    # ['https://czcb.com.cn/',
-    #  'https://www.vl.ru/dengi/']
-    from lxml import html
-    xpath = {0: '//*[@id="Tagbdiv1"]/table/tbody/tr[td="USD"]/td[2]',
-             1: '//*[@data-bank="577"]/td[@data-currency="USD"]'
-                '//span[contains(concat(" ", normalize-space(@class), " "), " js-operation-sell ")]'
-                '[contains(concat(" ", normalize-space(@class), " "), " rates-desktop__value ")]'}
-    result = {0: None, 1: None}
-    html_reader = HTMLReader(['https://czcb.com.cn/', 'https://www.vl.ru/dengi/'])
-    pages = await html_reader.get_pages()
-    for i, page in enumerate(pages):
-        try:
-            tree = html.fromstring(page)
-            data = tree.xpath(xpath[i])
-            result[i] = data[0].text.strip()
-        except Exception as e:
-            logger.error("Error occurred while parsing url %s, error: %r", html_reader.urls[i], e)
-
-    pprint(result)
-    await html_reader.session.close()
-    xe_reader = XeReader(symbols='USD/RUB, CNY/RUB, USD/CNY, XBT/USD')
-    rates = await xe_reader.get_rates()
-    pprint(rates)
-    await xe_reader.session.close()
+    async with make_session() as s:
+        results = await fetch_all(s,
+                                  YahooReader(s, symbols=YAHOO_SYMBOLS),
+                                  MOEXReader(s, symbols=['USD000UTSTOM', 'CNYRUB_TOM']),
+                                  GarantexReader(s),
+                                  XeReader(s, symbols='USD/RUB, CNY/RUB, USD/CNY, XBT/USD'))
+        pprint(results)
+        # 'TEnGt4WMjmVDmfDm9EC6xQXPWtMpuetobC'
+        # 'TZGRrMPEQMXyZndV1BaRy4SuCd3aTuKGBi'
+        # 'TYmxU6gD48Hf82cpBBHTHNJkhn1W6MrfML'
+        # 'TC1NPeCNwCb4bazcpHig2q3s3bFQBHUt2D'
+        # tron_reader = TronWalletReader(s, ['TZGRrMPEQMXyZndV1BaRy4SuCd3aTuKGBi',
+        #                                    'TEnGt4WMjmVDmfDm9EC6xQXPWtMpuetobC',
+        #                                    'TYmxU6gD48Hf82cpBBHTHNJkhn1W6MrfML',
+        #                                    'TC1NPeCNwCb4bazcpHig2q3s3bFQBHUt2D'])
+        # balances = await tron_reader.get_balances()
+        # pprint(balances)
+        # trnx = await tron_reader.get_transactions()
+        # pprint(trnx)
+        # bscscan_reader = BscScanWalletReader(s, '0xE5855278Ecf07e423BAecE3168fAD755B117E261')
+        # balances = await bscscan_reader.get_balances()
+        # pprint(balances)
+        # trnx = await bscscan_reader.get_transactions()
+        # pprint(trnx)
+        # https://www.xe.com/currencyconverter/convert/?Amount=25&From=USD&To=RUB
+        xpath = {0: '//*[@id="Tagbdiv1"]/table/tbody/tr[td="USD"]/td[2]',
+                 1: '//*[@data-bank="577"]/td[@data-currency="USD"]'
+                    '//span[contains(concat(" ", normalize-space(@class), " "), " js-operation-sell ")]'
+                    '[contains(concat(" ", normalize-space(@class), " "), " rates-desktop__value ")]'}
+        result = {0: None, 1: None}
+        html_reader = HTMLReader(s, ['https://czcb.com.cn/', 'https://www.vl.ru/dengi/'])
+        pages = await html_reader.get_pages()
+        for i, page in enumerate(pages):
+            try:
+                tree = html.fromstring(page)
+                data = tree.xpath(xpath[i])
+                result[i] = data[0].text.strip()
+            except Exception as e:
+                logger.error("Error occurred while parsing url %s, error: %r", html_reader.urls[i], e)
+        pprint(result)
+
+
+def _configure_logging():
+    logging.basicConfig(
+        level=logging.INFO,
+        format=u'%(filename)s:%(lineno)d #%(levelname)-8s [%(asctime)s] - %(name)s - %(message)s',
+    )
 
 
 if __name__ == '__main__':
+    _configure_logging()
     asyncio.run(test())
@@ -4,6 +4,8 @@ setup(
     name='ratesreader',
     version='0.01',
     packages=['ratesreader'],
+    python_requires='>=3.10',
+    install_requires=['aiohttp>=3.8.1', 'lxml>=4.7.1', 'orjson>=3.6.5', 'aiohttp-retry>=2.8.3'],
     url='https://github.com/akm77/ratesreader',
     license='MIT',
     author='Aleksey Kotryakhov',
@@ -0,0 +1,47 @@
+import ratesreader.cache as cache_module
+from ratesreader.cache import FileCache
+
+
+def test_set_get(tmp_path):
+    cache = FileCache(dir=str(tmp_path))
+    cache.set('key', {'rate': 1.5}, ttl=60)
+    assert cache.get('key') == {'rate': 1.5}
+
+
+def test_miss(tmp_path):
+    cache = FileCache(dir=str(tmp_path))
+    assert cache.get('missing') is None
+
+
+def test_expired(tmp_path, monkeypatch):
+    cache = FileCache(dir=str(tmp_path))
+    monkeypatch.setattr(cache_module.time, 'time', lambda: 1000.0)
+    cache.set('key', 'payload', ttl=30)
+    monkeypatch.setattr(cache_module.time, 'time', lambda: 1029.0)
+    assert cache.get('key') == 'payload'
+    monkeypatch.setattr(cache_module.time, 'time', lambda: 1031.0)
+    assert cache.get('key') is None
+
+
+def test_default_ttl(tmp_path, monkeypatch):
+    cache = FileCache(dir=str(tmp_path), default_ttl=10)
+    monkeypatch.setattr(cache_module.time, 'time', lambda: 1000.0)
+    cache.set('key', 'payload')
+    monkeypatch.setattr(cache_module.time, 'time', lambda: 1009.0)
+    assert cache.get('key') == 'payload'
+    monkeypatch.setattr(cache_module.time, 'time', lambda: 1011.0)
+    assert cache.get('key') is None
+
+
+def test_corrupt_file(tmp_path):
+    cache = FileCache(dir=str(tmp_path))
+    (tmp_path / 'key.json').write_text('{not json', encoding='utf-8')
+    assert cache.get('key') is None
+
+
+def test_invalid_entry(tmp_path):
+    cache = FileCache(dir=str(tmp_path))
+    (tmp_path / 'list.json').write_text('[1, 2]', encoding='utf-8')
+    (tmp_path / 'partial.json').write_text('{"ts": 1}', encoding='utf-8')
+    assert cache.get('list') is None
+    assert cache.get('partial') is None
@@ -0,0 +1,137 @@
+import asyncio
+import decimal
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from ratesreader.cache import FileCache
+from ratesreader.ratesreader import (RETRY_OPTIONS, BscScanWalletReader, RateLimiter, TronWalletReader, XeReader,
+                                     YahooReader, make_session)
+
+XE_PAGE = ('<html><body><div id="__next"><main><form><div></div><div><div></div><div></div>'
+           '<div><div><div><p>1 USD<!-- --> = <!-- -->91.23<span class="faded-digits">45</span> RUB</p>'
+           '</div></div></div></div></form></main></div></body></html>')
+
+
+async def _serve(routes, reader_fn):
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    async with TestServer(app) as server, make_session() as session:
+        return await reader_fn(server, session)
+
+
+def _counting(payload, calls):
+    async def handler(request):
+        calls.append(request.path)
+        return web.json_response(payload)
+    return handler
+
+
+def test_xe_rate_split_between_text_nodes():
+    async def page(request):
+        return web.Response(text=XE_PAGE, content_type='text/html')
+
+    async def read(server, session):
+        reader = XeReader(session, symbols='USD/RUB')
+        reader.urls = [str(server.make_url('/page'))]
+        return await reader.get_rates(ttl=None)
+
+    rates = asyncio.run(_serve({'/page': page}, read))
+    assert rates['USD/RUB'].rate == decimal.Decimal('91.2345')
+
+
+def test_xe_empty_page_is_skipped():
+    async def page(request):
+        return web.Response(text='', content_type='text/html')
+
+    async def read(server, session):
+        reader = XeReader(session, symbols='USD/RUB')
+        reader.urls = [str(server.make_url('/page'))]
+        return await reader.get_rates(ttl=None)
+
+    assert asyncio.run(_serve({'/page': page}, read)) == {}
+
+
+def test_rate_limiter_reaches_rate():
+    async def wait_all():
+        limiter = RateLimiter(rate=50, max_tokens=1)
+        started = time.monotonic()
+        await asyncio.gather(*[limiter.wait_for_token() for _ in range(21)])
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(wait_all())
+    assert 0.38 <= elapsed < 0.5
+
+
+class _Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def test_retry_timeouts():
+    for _ in range(20):
+        assert 1 <= RETRY_OPTIONS.get_timeout(attempt=1) <= 2
+        assert 2 <= RETRY_OPTIONS.get_timeout(attempt=2) <= 3
+    assert RETRY_OPTIONS.get_timeout(attempt=1, response=_Response({'Retry-After': '3'})) == 3
+    assert RETRY_OPTIONS.get_timeout(attempt=1, response=_Response({'Retry-After': '120'})) == 10
+
+
+def test_yahoo_cache_hit_skips_network(tmp_path):
+    calls = []
+    payload = {'quoteResponse': {'result': [{'symbol': 'USDRUB=X',
+                                             'shortName': 'USD/RUB',
+                                             'regularMarketPrice': 91.5}],
+                                 'error': None}}
+
+    async def read(server, session):
+        reader = YahooReader(session, symbols='USDRUB=X', cache=FileCache(dir=str(tmp_path)))
+        reader.url = str(server.make_url('/quote'))
+        return await reader.get_rates(), await reader.get_rates()
+
+    first, second = asyncio.run(_serve({'/quote': _counting(payload, calls)}, read))
+    assert len(calls) == 1
+    assert first['USDRUB=X'].rate == second['USDRUB=X'].rate == decimal.Decimal('91.5')
+
+
+def test_yahoo_error_is_not_cached(tmp_path):
+    calls = []
+    payload = {'quoteResponse': {'result': [], 'error': {'code': 'Too Many Requests'}}}
+
+    async def read(server, session):
+        reader = YahooReader(session, symbols='USDRUB=X', cache=FileCache(dir=str(tmp_path)))
+        reader.url = str(server.make_url('/quote'))
+        await reader.get_rates()
+        await reader.get_rates()
+
+    asyncio.run(_serve({'/quote': _counting(payload, calls)}, read))
+    assert len(calls) == 2
+
+
+def test_tron_failure_is_not_cached(tmp_path):
+    calls = []
+    payload = {'success': False, 'error': 'rate limit'}
+
+    async def read(server, session):
+        reader = TronWalletReader(session, 'W1', api_key=None, cache=FileCache(dir=str(tmp_path)))
+        reader.url = str(server.make_url('/accounts/'))
+        return await reader.get_balances(), await reader.get_balances()
+
+    first, second = asyncio.run(_serve({'/accounts/W1': _counting(payload, calls)}, read))
+    assert len(calls) == 2
+    assert first == second == {'W1': -1}
+
+
+def test_bscscan_notok_is_not_cached(tmp_path):
+    calls = []
+    payload = {'status': '0', 'message': 'NOTOK', 'result': 'Max rate limit reached'}
+
+    async def read(server, session):
+        reader = BscScanWalletReader(session, 'W1', cache=FileCache(dir=str(tmp_path)))
+        reader.url = str(server.make_url('/api'))
+        return await reader.get_balances(), await reader.get_balances()
+
+    first, second = asyncio.run(_serve({'/api': _counting(payload, calls)}, read))
+    assert len(calls) == 2
+    assert first == second == {'W1': -1}